@@ -0,0 +1,102 @@
+import argparse
+import sys
+from config.watermark_renderer import WatermarkSettings, ExportOptions
+from config.batch_processor import collect_inputs, batch_watermark
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Watermark many images at once without opening the GUI.")
+    parser.add_argument("inputs", nargs="+", help="Image files, directories or glob patterns (e.g. 'photos/**/*.jpg')")
+    parser.add_argument("-o", "--output", required=True, help="Directory to write watermarked images to")
+    parser.add_argument("--text", default="Watermark", help="Watermark text")
+    parser.add_argument("--font", default=None, help="Path to a TTF/OTF font (defaults to a system font)")
+    parser.add_argument("--size", type=int, default=36, help="Font size in pixels (12-200)")
+    parser.add_argument("--reference-width", type=int, default=None,
+                        help="Scale --size proportionally, treating it as measured on an image this wide")
+    parser.add_argument("--color", default="#FFFFFF", help="Hex color code, e.g. #FFFFFF")
+    parser.add_argument("--opacity", type=float, default=100, help="Watermark opacity (0-100)")
+    parser.add_argument("--position", type=float, nargs=2, default=(0.5, 0.5), metavar=("X", "Y"),
+                        help="Watermark center relative to the image (0-1 each)")
+    parser.add_argument("--logo", default=None, help="Image file to use as the watermark instead of text")
+    parser.add_argument("--logo-scale", type=float, default=0.25, help="Logo width as a fraction of the image width")
+    parser.add_argument("--angle", type=float, default=0, help="Rotate the watermark by this many degrees")
+    parser.add_argument("--tile", action="store_true", help="Repeat the watermark across the whole image")
+    parser.add_argument("--spacing", type=float, default=0.5,
+                        help="Gap between tiles as a fraction of the watermark size")
+    parser.add_argument("--format", default=None, help="Force output format by extension (png, jpg, ...)")
+    parser.add_argument("--quality", type=int, default=95, help="JPEG/WebP quality (1-100)")
+    parser.add_argument("--progressive", action="store_true", help="Write progressive JPEGs")
+    parser.add_argument("--optimize", action="store_true", help="Spend extra encoder time for smaller files")
+    parser.add_argument("--compress-level", type=int, default=6, help="PNG compression level (0-9)")
+    parser.add_argument("--lossless", action="store_true", help="Write lossless WebP")
+    parser.add_argument("--strip-metadata", action="store_true", help="Do not copy EXIF/ICC from the source")
+    parser.add_argument("--force", action="store_true",
+                        help="Reprocess everything, ignoring (but still updating) the manifest of finished outputs")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Maximum images queued at once (default: 2x workers)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = collect_inputs(args.inputs, exclude_dir=args.output)
+    if not paths:
+        print("Error: no images found in the given inputs.", file=sys.stderr)
+        return 2
+
+    settings = WatermarkSettings(
+        text=args.text,
+        font=args.font,
+        size=args.size,
+        color=args.color,
+        alpha=int(args.opacity * 2.55),  # Convert from 0-100 to 0-255
+        position=tuple(args.position),
+        reference_width=args.reference_width,
+        logo=args.logo,
+        logo_scale=args.logo_scale,
+        angle=args.angle,
+        tile=args.tile,
+        spacing=args.spacing
+    )
+
+    options = ExportOptions(
+        quality=args.quality,
+        progressive=args.progressive,
+        optimize=args.optimize,
+        compress_level=args.compress_level,
+        lossless=args.lossless,
+        keep_metadata=not args.strip_metadata
+    )
+
+    total = len(paths)
+    completed = skipped_count = 0
+
+    def report(source, destination, error, skipped):
+        nonlocal completed, skipped_count
+        completed += 1
+        if error:
+            print(f"[{completed}/{total}] FAILED {source}: {error}", file=sys.stderr)
+        elif skipped:
+            skipped_count += 1
+            print(f"[{completed}/{total}] up to date {destination}")
+        else:
+            print(f"[{completed}/{total}] {source} -> {destination}")
+
+    failures = batch_watermark(
+        paths, args.output, settings,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        output_format=args.format,
+        options=options,
+        on_result=report,
+        force=args.force
+    )
+
+    print(f"Done: {total - len(failures) - skipped_count} processed, {skipped_count} up to date, "
+          f"{len(failures)} failed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from PIL import Image
+from config.image_loader import fit_size
+from config.watermark_renderer import (
+    WatermarkSettings, ExportOptions, apply_watermark, sprite_for, save_image, clear_render_caches
+)
+
+DEFAULT_SIZES = [1, 12, 50, 100]  # Megapixels
+TEXTS = {"short": "Watermark", "long": "© 2024 Example Product Photography — All Rights Reserved"}
+FONT_SIZES = [36, 144]
+FORMATS = ["jpg", "png", "webp"]
+
+
+def make_image(megapixels):
+    """Synthetic 3:2 RGB photo with some texture so encoders have real work to do"""
+    width = int((megapixels * 1_000_000 * 1.5) ** 0.5)
+    height = int(width / 1.5)
+    noise = Image.effect_noise((max(1, width // 8), max(1, height // 8)), 64)
+    noise = noise.resize((width, height), Image.Resampling.BILINEAR)
+    gradient = Image.linear_gradient('L').resize((width, height))
+    return Image.merge('RGB', (noise, gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+
+def measure(func, repeat, setup=None):
+    """Median wall time of ``repeat`` calls.
+
+    With ``setup``, its result is passed to ``func`` and it runs untimed, e.g.
+    to give each call a fresh copy of an image that ``func`` modifies in place.
+    """
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process, or None where unsupported (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_size(megapixels, repeat):
+    """Benchmark every case for one image size; runs in a fresh process for clean peak memory"""
+    image = make_image(megapixels)
+    actual_mp = image.width * image.height / 1_000_000
+    cases = {}
+
+    for text_name, text in TEXTS.items():
+        for font_size in FONT_SIZES:
+            settings = WatermarkSettings(text=text, size=font_size, alpha=128)
+
+            def render():
+                clear_render_caches()
+                sprite_for(settings, image.width)
+
+            cases[f"render/{text_name}/{font_size}px"] = measure(render, repeat)
+            # apply_watermark draws in place, so each run gets a clean copy of the image
+            cases[f"composite/{text_name}/{font_size}px"] = measure(
+                lambda target: apply_watermark(target, settings), repeat, setup=image.copy
+            )
+
+    tiled = WatermarkSettings(text=TEXTS["short"], size=36, alpha=96, angle=30, tile=True)
+    apply_watermark(image.copy(), tiled)  # Prepare the pattern once, as batch runs would
+    cases["tile/short/36px"] = measure(lambda target: apply_watermark(target, tiled), repeat, setup=image.copy)
+    cases["resize/preview"] = measure(
+        lambda: image.resize(fit_size(image.size), Image.Resampling.LANCZOS, reducing_gap=2.0), repeat
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for image_format in FORMATS:
+            path = os.path.join(tmp, f"out.{image_format}")
+            cases[f"encode/{image_format}"] = measure(lambda: save_image(image, path, ExportOptions()), repeat)
+
+    results = {
+        f"{megapixels}MP/{case}": {
+            "seconds": seconds,
+            "images_per_s": 1 / seconds if seconds else float('inf'),
+            "mp_per_s": actual_mp / seconds if seconds else float('inf'),
+        }
+        for case, seconds in cases.items()
+    }
+    return results, peak_rss_mb()
+
+
+def run(sizes, repeat):
+    results, peak_mb = {}, {}
+    context = multiprocessing.get_context('spawn')
+    for megapixels in sizes:
+        print(f"Benchmarking {megapixels} MP...", file=sys.stderr)
+        with context.Pool(1) as pool:
+            size_results, peak = pool.apply(run_size, (megapixels, repeat))
+        results.update(size_results)
+        peak_mb[f"{megapixels}MP"] = peak
+    return {"results": results, "peak_mb": peak_mb}
+
+
+def print_report(report):
+    print(f"{'case':<36}{'ms':>10}{'img/s':>10}{'MP/s':>10}")
+    for key, result in report["results"].items():
+        print(f"{key:<36}{result['seconds'] * 1000:>10.2f}{result['images_per_s']:>10.2f}{result['mp_per_s']:>10.1f}")
+    print()
+    for size, peak in report["peak_mb"].items():
+        print(f"peak RSS {size:<8}" + (f"{peak:>10.1f} MB" if peak is not None else "       n/a"))
+
+
+def compare(report, baseline, tolerance):
+    """List of human-readable regressions against ``baseline`` beyond ``tolerance`` (0.15 = 15%)"""
+    regressions = []
+    for key, result in report["results"].items():
+        old = baseline["results"].get(key)
+        if old and result["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{key}: {old['seconds'] * 1000:.2f} ms -> {result['seconds'] * 1000:.2f} ms "
+                f"(+{(result['seconds'] / old['seconds'] - 1) * 100:.0f}%)"
+            )
+    for size, peak in report["peak_mb"].items():
+        old = baseline["peak_mb"].get(size)
+        if old and peak and peak > old * (1 + tolerance):
+            regressions.append(f"peak RSS {size}: {old:.1f} MB -> {peak:.1f} MB")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark watermark rendering, compositing and encoding.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES, help="Image sizes in megapixels")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the median is reported")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write results to FILE as the new baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a saved baseline and flag regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed slowdown / memory growth before flagging (0.15 = 15%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(size) if float(size).is_integer() else size for size in args.sizes]
+    report = run(sizes, args.repeat)
+    print_report(report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
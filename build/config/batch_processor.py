@@ -0,0 +1,237 @@
+# Section 4: Batch Processing across a process pool
+import glob
+import os
+from pathlib import Path
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from config.watermark_renderer import export_watermark
+from config.manifest import Manifest, file_hash, params_hash
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.webp'}
+
+# Settings are sent once per worker process instead of being pickled per task
+_worker_settings = None
+_worker_options = None
+_worker_track_sources = False
+
+
+def _glob_root(pattern):
+    """Directory part of a glob pattern before the first wildcard"""
+    parts = []
+    for part in Path(pattern).parts:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return str(Path(*parts)) if parts else os.curdir
+
+
+def _is_within(path, directory):
+    path, directory = os.path.realpath(path), os.path.realpath(directory)
+    return os.path.commonpath((path, directory)) == directory
+
+
+def collect_inputs(sources, exclude_dir=None):
+    """Expand directories, glob patterns and plain file paths into image paths.
+
+    Returns ``(path, root)`` pairs, where ``root`` is the directory or glob
+    prefix the file was found under (None for explicit files), so outputs can
+    mirror the input layout. Files found under ``exclude_dir`` (the output
+    directory) are left out, so a rerun does not watermark earlier outputs.
+    """
+    paths = {}
+    for source in sources:
+        if os.path.isdir(source):
+            root = source
+            candidates = sorted(os.path.join(source, name) for name in os.listdir(source))
+        elif glob.has_magic(source):
+            root = _glob_root(source)
+            candidates = sorted(glob.glob(source, recursive=True))
+        else:
+            # Explicit files are kept as-is so a missing one is reported as a failure
+            paths.setdefault(source, None)
+            continue
+        for path in candidates:
+            if exclude_dir and _is_within(path, exclude_dir):
+                continue
+            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+                # Preserve order but drop duplicates from overlapping sources
+                paths.setdefault(path, root)
+    return list(paths.items())
+
+
+def output_path_for(source_path, output_dir, output_format=None, root=None):
+    """Destination path for a source image, optionally forcing a new extension.
+
+    With ``root``, the source's path relative to it is kept below ``output_dir``
+    (``in/a/x.jpg`` under root ``in`` becomes ``output_dir/a/x.jpg``), so files
+    with the same name in different folders do not collide.
+    """
+    relative = os.path.relpath(source_path, root) if root else os.path.basename(source_path)
+    if relative.startswith(os.pardir):
+        relative = os.path.basename(source_path)
+    name, ext = os.path.splitext(relative)
+    if output_format:
+        ext = '.' + output_format.lower().lstrip('.')
+    return os.path.join(output_dir, name + ext)
+
+
+def _init_worker(settings, options, track_sources):
+    global _worker_settings, _worker_options, _worker_track_sources
+    _worker_settings, _worker_options = settings, options
+    _worker_track_sources = track_sources
+
+
+def _process_one(source_path, destination, known_hash=None):
+    """Watermark a single file inside a worker; errors are returned, not raised.
+
+    Returns ``(source, destination, error, record)``. With source tracking on,
+    ``record`` describes the source for the manifest, and the file is skipped
+    (``record["skipped"]``) when its content hash equals ``known_hash``.
+    """
+    record = None
+    try:
+        if _worker_track_sources:
+            stat = os.stat(source_path)
+            record = {
+                "source": os.path.abspath(source_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "source_hash": file_hash(source_path),
+                "skipped": False,
+            }
+            if record["source_hash"] == known_hash:
+                # Touched but unchanged; the existing output is still valid
+                record["skipped"] = True
+                return source_path, destination, None, record
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        export_watermark(source_path, destination, _worker_settings, _worker_options)
+        return source_path, destination, None, record
+    except Exception as e:
+        return source_path, destination, f"{type(e).__name__}: {e}", None
+
+
+def batch_watermark(paths, output_dir, settings, workers=None, max_in_flight=None,
+                    output_format=None, options=None, on_result=None, incremental=True, force=False):
+    """Watermark ``paths`` into ``output_dir`` using a pool of worker processes.
+
+    ``paths`` holds file paths or ``(path, root)`` pairs from ``collect_inputs``.
+    A source whose destination is the source itself, or is already taken by an
+    earlier source, fails instead of overwriting it.
+
+    At most ``max_in_flight`` files are queued at once (default: twice the worker
+    count) so memory stays bounded no matter how many inputs there are.
+    ``options`` is an ``ExportOptions`` controlling the encoder.
+
+    With ``incremental`` on, a manifest in ``output_dir`` records each finished
+    output against the source's content hash and a hash of the watermark
+    parameters; outputs that are already up to date are skipped, and an
+    interrupted run picks up where it stopped. ``force`` reprocesses every file
+    but still records the new outputs, so later runs do not trust stale entries.
+
+    If a worker process dies, the pool is restarted and the files that were in
+    flight are retried one at a time, so only the file that crashed it fails.
+
+    ``on_result(source, destination, error, skipped)`` is called as each file
+    finishes. Returns a list of ``(source, error)`` pairs for the files that failed.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max(1, max_in_flight or workers * 2)
+    manifest = Manifest.for_output_dir(output_dir) if incremental else None
+    params = params_hash(settings, options, output_format) if incremental else None
+    failures = []
+    pending = {}  # future -> (source, destination, known_hash)
+    claimed = {}  # destination -> source
+
+    def start_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(settings, options, incremental))
+
+    pool = start_pool()
+
+    def restart_pool():
+        nonlocal pool
+        pool.shutdown(wait=False, cancel_futures=True)
+        pool = start_pool()
+
+    def report(source, destination, error, skipped):
+        if error:
+            failures.append((source, error))
+        if on_result:
+            on_result(source, destination, error, skipped)
+
+    def finish(future, job):
+        """Report a finished job; returns False if its worker process died instead"""
+        try:
+            source, destination, error, record = future.result()
+        except BrokenExecutor:
+            return False
+        if manifest is not None and record is not None:
+            skipped = record.pop("skipped")
+            manifest.record(dict(record, destination=destination, params_hash=params))
+        else:
+            skipped = False
+        report(source, destination, error, skipped)
+        return True
+
+    def collect(return_when):
+        """Report finished jobs; if a worker died, restart the pool and retry its jobs"""
+        crashed = []
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            job = pending.pop(future)
+            if not finish(future, job):
+                crashed.append(job)
+        if not crashed:
+            return
+        # A dead worker (e.g. killed for running out of memory) breaks the whole pool and
+        # fails every job in flight, so it is unknown which file caused it
+        for future in wait(pending)[0]:
+            job = pending.pop(future)
+            if not finish(future, job):
+                crashed.append(job)
+        restart_pool()
+        # Retry each one alone, so the file that kills a worker only fails itself
+        for job in crashed:
+            future = pool.submit(_process_one, *job)
+            wait([future])
+            if not finish(future, job):
+                report(job[0], job[1], "Worker process died while processing this file", False)
+                restart_pool()
+
+    def submit(job):
+        try:
+            pending[pool.submit(_process_one, *job)] = job
+        except BrokenExecutor:
+            # The pool broke after the last collect; recover, then queue on a fresh pool
+            collect(ALL_COMPLETED)
+            restart_pool()
+            pending[pool.submit(_process_one, *job)] = job
+
+    try:
+        for item in paths:
+            source, root = item if isinstance(item, tuple) else (item, None)
+            destination = os.path.abspath(output_path_for(source, output_dir, output_format, root))
+            if os.path.realpath(destination) == os.path.realpath(source):
+                report(source, destination, "Output would overwrite the source file", False)
+                continue
+            if destination in claimed:
+                report(source, destination, f"Output already written for {claimed[destination]}", False)
+                continue
+            claimed[destination] = source
+            known_hash = None
+            if manifest is not None and not force:
+                up_to_date, known_hash = manifest.check(os.path.abspath(source), destination, params)
+                if up_to_date:
+                    report(source, destination, None, True)
+                    continue
+            if len(pending) >= max_in_flight:
+                collect(FIRST_COMPLETED)
+            submit((source, destination, known_hash))
+        while pending:
+            collect(ALL_COMPLETED)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        if manifest is not None:
+            manifest.compact()
+
+    return failures
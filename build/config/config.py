@@ -8,6 +8,14 @@ class Config:
     last_save_path = None 
     appearance_mode = "dark"  # Default to dark mode
     theme = "green"  # Default theme
+    jpeg_quality = 95  # Export quality for JPEG/WebP (1-100)
+    jpeg_progressive = False
+    optimize_output = False  # Extra encoder passes for smaller files
+    png_compress_level = 6  # 0 (fastest) - 9 (smallest)
+    keep_metadata = True  # Copy EXIF/ICC from the source on export
+    logo_scale = 0.25  # Logo watermark width as a fraction of the image width
+    tile_angle = 30  # Rotation (degrees) of tiled watermarks
+    tile_spacing = 0.5  # Gap between tiles as a fraction of the watermark size
 # You can extend this class with more configuration options if needed
     def _update_label_colors():
         appearance_mode = Config.appearance_mode # Get the appearance mode
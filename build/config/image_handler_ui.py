@@ -2,37 +2,38 @@
 import tkinter as tk
 from PIL import Image, ImageTk
 from tkinter import Canvas, Label
-import os
+from config.watermark_renderer import find_default_font
+from config.zoom_pyramid import ZoomPyramid
+from config.image_loader import BackgroundTask, fit_size, read_size, load_preview
+from config.perf_stats import timed
+
+# Delay before replacing the fast bilinear preview with a high-quality one
+HQ_RENDER_DELAY_MS = 150
+MIN_ZOOM, MAX_ZOOM = 0.5, 2.0
 
 class CustomImageGallery(tk.Frame):
-    def __init__(self, parent, img_path):
+    def __init__(self, parent, img_path, on_ready=None):
         super().__init__(parent)
-        self.image = Image.open(img_path).convert('RGBA')
+        self.on_ready = on_ready  # Called with None or the load error once the preview is in
         self.zoom, self.dragging, self.dragging_watermark = 1.0, False, False
         self.watermark_alpha, self.watermark_color = 255, "#FFFFFF"
         self.watermark_size = 36
         self.has_watermark = False
-        self.watermark_layer = None
-        self.original_image = self.image.copy()
+        # Last applied settings, their cached sprite and the preview area it covers
+        self.watermark_settings, self.watermark_sprite, self.watermark_rect = None, None, None
+        self.watermark_text_size = None
+        self.composite = None  # Visible part of the preview with the watermark applied
         self.control_panel_dragging = False  # New variable for control panel dragging
         
         # Set up canvas and initial image
         self.canvas = Canvas(self, bg="#2b2b2b", height=480, width=800)
         self.canvas.pack(fill=tk.BOTH, expand=True)
         
-        # Calculate initial image size
-        canvas_ratio = 800 / 480
-        img_ratio = self.image.width / self.image.height
-        new_size = (800, int(800 / img_ratio)) if img_ratio > canvas_ratio else (int(480 * img_ratio), 480)
-        self.base_image = self.image.resize(new_size, Image.Resampling.LANCZOS)
-        self.image = self.base_image.copy()
-        self.watermark_x, self.watermark_y = self.image.width // 2, self.image.height // 2
-        
         # Initialize the image position at the center
         self.canvas_center_x = self.canvas.winfo_reqwidth() // 2
         self.canvas_center_y = self.canvas.winfo_reqheight() // 2
-        
-        self.update_display()
+        self._render_job, self._hq_job = None, None
+
         self.zoom_label = Label(self, text="Zoom: 100%", bg="white")
         self.zoom_label.place(x=30, y=500, anchor='sw')
         
@@ -45,24 +46,52 @@ class CustomImageGallery(tk.Frame):
         # Bind canvas resize event to keep image centered
         self.canvas.bind('<Configure>', self._on_canvas_resize)
 
+        self.open_image(img_path)
+
+    def open_image(self, img_path):
+        """Show ``img_path``, reusing this canvas; pixels are decoded in the background"""
+        # Size the preview from the file header; raises before any state changes if it cannot be read
+        source_size = read_size(img_path)
+        self.img_path = img_path  # Full-resolution source, only decoded on export
+        self.source_size = source_size
+
+        # Show a placeholder right away
+        new_size = fit_size(source_size)
+        self.base_image = Image.new('RGBA', new_size, "#3a3a3a")
+        self.preview_ready = False
+        self.watermark_x, self.watermark_y = self.base_image.width // 2, self.base_image.height // 2
+
+        self.zoom = 1.0
+        self.zoom_label.config(text="Zoom: 100%")
+
+        # Only the visible rectangle of the zoomed image is rendered (self.image)
+        self.pyramid = ZoomPyramid(self.base_image, MIN_ZOOM)
+        self.view_center = (self.canvas_center_x, self.canvas_center_y)
+        self.view_rect, self.view_key, self.view_resample = None, None, None
+        self._render_view()
+
+        BackgroundTask(load_preview, img_path, new_size).when_done(
+            self, lambda image, error: self._on_preview_loaded(img_path, image, error)
+        )
+
+    def _on_preview_loaded(self, img_path, image, error):
+        """Swap the placeholder for the decoded preview (same size, so nothing else moves)"""
+        if img_path != self.img_path:
+            return  # Another image was opened while this one was loading
+        if error is None:
+            self.base_image = image
+            self.pyramid = ZoomPyramid(image, MIN_ZOOM)
+            self.preview_ready = True
+            self.view_key = None  # Force a re-render of the current view
+            self._render_view()
+        else:
+            print(f"Error loading image: {error}")
+        if self.on_ready:
+            self.on_ready(error)
+
     def _get_default_font(self):
         """Try to load a system font, fallback to default if none available"""
-        try:
-            font_paths = [
-                "C:/Windows/Fonts/arial.ttf",
-                "C:/Windows/Fonts/segoeui.ttf",
-                "/Library/Fonts/Arial.ttf",
-                "/System/Library/Fonts/Helvetica.ttc",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                "/usr/share/fonts/TTF/arial.ttf"
-            ]
-            
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    return font_path
-            return None
-        except:
-            return None
+        return find_default_font()
 
 
     def _on_canvas_resize(self, event):
@@ -70,7 +99,8 @@ class CustomImageGallery(tk.Frame):
         if hasattr(self, 'img_id'):
             self.canvas_center_x = event.width // 2
             self.canvas_center_y = event.height // 2
-            self.canvas.coords(self.img_id, self.canvas_center_x, self.canvas_center_y)
+            self.view_center = (self.canvas_center_x, self.canvas_center_y)
+            self._schedule_render()
 
     def _bind_events(self):
         """Bind all necessary events"""
@@ -87,58 +117,91 @@ class CustomImageGallery(tk.Frame):
         for event, callback in events.items():
             self.canvas.bind(event, callback)
 
-    def update_display(self):
-        """Update the display with current image and watermark"""
-        if self.watermark_layer:
-            # Resize watermark layer to match current image size
-            resized_watermark = self.watermark_layer.resize(self.image.size, Image.Resampling.LANCZOS)
-            composite = Image.alpha_composite(self.image.convert('RGBA'), resized_watermark)
-        else:
-            composite = self.image
-            
-        self.img_tk = ImageTk.PhotoImage(composite)
-        
+    def _zoomed_size(self):
+        """Size of the whole preview image at the current zoom"""
+        return int(self.base_image.width * self.zoom), int(self.base_image.height * self.zoom)
+
+    def _image_canvas_origin(self):
+        """Canvas position of the zoomed image's top-left corner (it may be off-canvas)"""
+        width, height = self._zoomed_size()
+        return self.view_center[0] - width // 2, self.view_center[1] - height // 2
+
+    def _canvas_size(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:  # Not mapped yet
+            return self.canvas.winfo_reqwidth(), self.canvas.winfo_reqheight()
+        return width, height
+
+    @timed('render_view')
+    def _render_view(self, resample=Image.Resampling.LANCZOS):
+        """Render only the part of the zoomed image that is visible on the canvas"""
+        width, height = self._zoomed_size()
+        left, top = self._image_canvas_origin()
+        canvas_width, canvas_height = self._canvas_size()
+        view = (max(0, -left), max(0, -top), min(width, canvas_width - left), min(height, canvas_height - top))
+        if view[2] <= view[0] or view[3] <= view[1]:
+            view = (0, 0, 1, 1)  # Panned fully off-canvas; keep a placeholder
+
+        key = (self.zoom, view)
+        upgrade = self.view_resample == Image.Resampling.BILINEAR and resample != self.view_resample
+        if key == self.view_key and not upgrade:
+            return  # Same pixels as on screen; a pan has already moved the item
+        self.view_key, self.view_rect, self.view_resample = key, view, resample
+        self.image = self.pyramid.render(self.zoom, view, resample)
+        self.update_display()
+
+    def _schedule_render(self):
+        """Fast bilinear render on the next idle, then a high-quality pass once input settles"""
+        if self._render_job is None:
+            self._render_job = self.after_idle(self._fast_render)
+        if self._hq_job is not None:
+            self.after_cancel(self._hq_job)
+        self._hq_job = self.after(HQ_RENDER_DELAY_MS, self._hq_render)
+
+    def _fast_render(self):
+        self._render_job = None
+        self._render_view(Image.Resampling.BILINEAR)
+
+    def _hq_render(self):
+        self._hq_job = None
+        self._render_view(Image.Resampling.LANCZOS)
+
+    def _show(self, image):
+        """Put ``image`` on the canvas at the current view rectangle"""
+        self.img_tk = ImageTk.PhotoImage(image)
+        left, top = self._image_canvas_origin()
+        x, y = left + self.view_rect[0], top + self.view_rect[1]
+
         if not hasattr(self, 'img_id'):
-            # Initialize image at the center of the canvas
-            self.img_id = self.canvas.create_image(
-                self.canvas.winfo_reqwidth() // 2,
-                self.canvas.winfo_reqheight() // 2,
-                image=self.img_tk,
-                anchor='center'
-            )
+            self.img_id = self.canvas.create_image(x, y, image=self.img_tk, anchor='nw')
         else:
             self.canvas.itemconfig(self.img_id, image=self.img_tk)
+            self.canvas.coords(self.img_id, x, y)
+
+    def update_display(self):
+        """Update the display with the current view"""
+        self._show(self.image)
 
 
+    @timed('handle_zoom')
     def _handle_zoom(self, factor):
-        """Handle zoom with proper image scaling"""
-        if self.has_watermark:
-            return  # Disable zoom when control panel is open
-            
+        """Handle zoom; wheel bursts are coalesced and rendered for the viewport only"""
         new_zoom = self.zoom * factor
-        if 0.5 <= new_zoom <= 2.0:
+        if MIN_ZOOM <= new_zoom <= MAX_ZOOM:
             self.zoom = new_zoom
             self.zoom_label.config(text=f"Zoom: {int(self.zoom * 100)}%")
-            
-            # Calculate new image size based on zoom
-            new_width = int(self.base_image.width * self.zoom)
-            new_height = int(self.base_image.height * self.zoom)
-            
-            # Resize the image
-            self.image = self.base_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            self.update_display()
+            self._schedule_render()
 
     def _start_drag(self, event):
         self.prev_x, self.prev_y = event.x, event.y
         if self.has_watermark:
-            img_bbox = self.canvas.bbox(self.img_id)
-            if img_bbox:
-                wx = self.watermark_x * self.zoom + img_bbox[0]
-                wy = self.watermark_y * self.zoom + img_bbox[1]
-                if abs(event.x - wx) < 50 and abs(event.y - wy) < 50:
-                    self.dragging_watermark = True
-                    return
+            left, top = self._image_canvas_origin()
+            wx = self.watermark_x * self.zoom + left
+            wy = self.watermark_y * self.zoom + top
+            if abs(event.x - wx) < 50 and abs(event.y - wy) < 50:
+                self.dragging_watermark = True
+                self._begin_watermark_drag()
+                return
         self.dragging = True
         self.canvas.config(cursor="hand2")
 
@@ -147,13 +210,18 @@ class CustomImageGallery(tk.Frame):
             dx, dy = (event.x - self.prev_x) / self.zoom, (event.y - self.prev_y) / self.zoom
             self.watermark_x = max(0, min(self.watermark_x + dx, self.base_image.width))
             self.watermark_y = max(0, min(self.watermark_y + dy, self.base_image.height))
-            self._update_watermark()
+            self._schedule_watermark_move()
         elif self.dragging:
-            x, y = self.canvas.coords(self.img_id)
-            self.canvas.coords(self.img_id, x + event.x - self.prev_x, y + event.y - self.prev_y)
+            dx, dy = event.x - self.prev_x, event.y - self.prev_y
+            self.view_center = (self.view_center[0] + dx, self.view_center[1] + dy)
+            # Move the rendered pixels now; newly exposed areas are filled in on idle
+            self.canvas.move(self.img_id, dx, dy)
+            self._schedule_render()
         self.prev_x, self.prev_y = event.x, event.y
 
     def _stop_drag(self, event):
+        if self.dragging_watermark:
+            self._end_watermark_drag()
         self.dragging = self.dragging_watermark = False
         self.canvas.config(cursor="arrow")
 
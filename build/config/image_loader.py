@@ -0,0 +1,70 @@
+# Section 6: Fast Image Loading & Background Tasks
+import threading
+from PIL import ExifTags, Image, ImageOps
+from config.watermark_renderer import editable_image
+
+# Area the preview is fitted into; matches the editor canvas
+PREVIEW_WIDTH, PREVIEW_HEIGHT = 800, 480
+
+
+def fit_size(source_size, max_width=PREVIEW_WIDTH, max_height=PREVIEW_HEIGHT):
+    """Largest size with the source's aspect ratio that fills the preview area"""
+    width, height = source_size
+    img_ratio = width / height
+    if img_ratio > max_width / max_height:
+        return max_width, max(1, int(max_width / img_ratio))
+    return max(1, int(max_height * img_ratio)), max_height
+
+
+def _is_rotated(image):
+    """True if the EXIF orientation turns the image by 90 degrees when displayed"""
+    return image.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8)
+
+
+def read_size(path):
+    """Upright image dimensions from the file header, without decoding any pixels"""
+    with Image.open(path) as image:
+        width, height = image.size
+        return (height, width) if _is_rotated(image) else (width, height)
+
+
+def load_preview(path, size):
+    """Decode ``path`` straight to a preview of ``size`` as RGBA.
+
+    JPEGs are decoded at 1/2, 1/4 or 1/8 scale by libjpeg (``draft``) so a
+    50 MP photo never materializes at full size; other formats are shrunk with
+    ``reduce`` before the final LANCZOS pass (``reducing_gap``). The EXIF
+    orientation is applied, so the preview matches the exported image.
+    """
+    with Image.open(path) as image:
+        image.draft('RGB', size[::-1] if _is_rotated(image) else size)
+        ImageOps.exif_transpose(image, in_place=True)
+        if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            image = editable_image(image)  # Same conversion as export, so the preview matches
+        return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0).convert('RGBA')
+
+
+class BackgroundTask:
+    """Run ``func(*args)`` on a daemon thread and hand the result back on the Tk thread"""
+
+    POLL_MS = 30
+
+    def __init__(self, func, *args):
+        self.result, self.error = None, None
+        self._done = threading.Event()
+        threading.Thread(target=self._run, args=(func, args), daemon=True).start()
+
+    def _run(self, func, args):
+        try:
+            self.result = func(*args)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    def when_done(self, widget, callback):
+        """Call ``callback(result, error)`` from ``widget``'s event loop once finished"""
+        if self._done.is_set():
+            callback(self.result, self.error)
+        else:
+            widget.after(self.POLL_MS, self.when_done, widget, callback)
@@ -0,0 +1,96 @@
+# Section 9: Incremental Processing Manifest
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".watermark_manifest.jsonl"
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Content hash of a file, read in chunks so large scans are not loaded at once"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def params_hash(settings, options=None, output_format=None):
+    """Hash of everything that affects the output besides the source pixels"""
+    params = {
+        "settings": settings.key(),
+        "options": vars(options) if options else None,
+        "format": output_format,
+    }
+    if settings.logo and os.path.exists(settings.logo):
+        params["logo"] = file_hash(settings.logo)
+    encoded = json.dumps(params, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=20).hexdigest()
+
+
+class Manifest:
+    """Record of finished outputs, keyed by destination path.
+
+    Each entry stores the source's path, size, mtime and content hash plus the
+    parameter hash it was rendered with. Entries are appended one JSON line per
+    finished file, so an interrupted run keeps everything completed so far;
+    a truncated last line is ignored on load and ``compact()`` rewrites the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._file = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written line from an interrupted run
+                    self.entries[entry["destination"]] = entry
+
+    @classmethod
+    def for_output_dir(cls, output_dir):
+        return cls(os.path.join(output_dir, MANIFEST_NAME))
+
+    def check(self, source, destination, params):
+        """Return ``(up_to_date, known_hash)`` for a planned output.
+
+        ``up_to_date`` is True when the output exists, was made with ``params``
+        and the source's size and mtime are unchanged, so no hashing is needed.
+        Otherwise ``known_hash`` is the content hash the output was last made
+        from (or None), for the worker to compare against after hashing.
+        """
+        entry = self.entries.get(destination)
+        if not entry or entry["params_hash"] != params or not os.path.exists(destination):
+            return False, None
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return False, None
+        if entry["source"] == source and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return True, entry["source_hash"]
+        return False, entry["source_hash"]
+
+    def record(self, entry):
+        """Store ``entry`` and append it to disk immediately"""
+        self.entries[entry["destination"]] = entry
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def compact(self):
+        """Rewrite the manifest with one line per destination"""
+        self.close()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
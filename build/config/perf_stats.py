@@ -0,0 +1,70 @@
+# Section 8: Opt-in Timing Instrumentation for hot paths
+import atexit
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+# Samples kept per timer; enough for stable percentiles without growing forever
+MAX_SAMPLES = 1000
+
+
+class PerfStats:
+    """Collects call durations per name and prints a summary.
+
+    Disabled unless the ``WATERMARK_PERF`` environment variable is set (or
+    ``enable()`` is called), in which case the summary is printed on exit.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            atexit.register(lambda: print(self.summary()))
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=MAX_SAMPLES)).append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        """Table of count / mean / p95 / max in milliseconds per timer"""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+        lines = [f"{'timer':<24}{'calls':>8}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, values in sorted(samples.items()):
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            lines.append(
+                f"{name:<24}{len(values):>8}{sum(values) / len(values) * 1000:>10.2f}"
+                f"{p95 * 1000:>10.2f}{values[-1] * 1000:>10.2f}"
+            )
+        return "\n".join(lines)
+
+
+stats = PerfStats()
+if os.environ.get("WATERMARK_PERF", "") not in ("", "0"):
+    stats.enable()
+
+
+def timed(name):
+    """Decorator recording the duration of each call under ``name`` when stats are enabled"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not stats.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -1,5 +1,4 @@
 import tkinter as tk
-from tkinter import Image
 from config.watermark_handler import WatermarkHandler
 import customtkinter as ctk
 from config.config import Config
@@ -15,12 +14,6 @@ class WatermarkControls:
         if self.watermark_handler.has_watermark:
             return
 
-        # Reset zoom and prepare the base image for watermarking
-        self.watermark_handler.zoom = 1.0
-        self.watermark_handler.image = self.watermark_handler.base_image.copy()
-        self.watermark_handler.zoom_label.config(text="Zoom: 100%")
-        self.watermark_handler.update_display()
-
         # Create the control panel frame and place it on the screen
         self.watermark_handler.control_panel = ctk.CTkFrame(
             self.watermark_handler,
@@ -109,15 +102,25 @@ class WatermarkControls:
             }[text]
             setattr(self.watermark_handler, widget_name, widget)
 
+        # Graphic watermark and anti-cropping tile pattern options
+        ctk.CTkButton(
+            self.watermark_handler.control_panel, text="Choose Logo", command=self.watermark_handler.choose_logo,
+            width=150, height=25, corner_radius=10
+        ).pack(pady=(0, 10), padx=15, fill='x')
+        self.watermark_handler.tile_checkbox = ctk.CTkCheckBox(
+            self.watermark_handler.control_panel, text="Tile Pattern", command=self.watermark_handler._update_watermark,
+            text_color=Config._update_label_colors()[1]
+        )
+        self.watermark_handler.tile_checkbox.pack(pady=(0, 10), padx=15, anchor='w')
+
         # Add a button to save the watermarked image
         ctk.CTkButton(
             self.watermark_handler.control_panel, text="Save Image", command=self.watermark_handler.save_watermarked_image,
             fg_color="#4CAF50", hover_color="#45a049", width=150, height=25, corner_radius=10, text_color="white"
         ).pack(pady=(0, 10), padx=15, fill='x')
 
-        # Set watermark as added and initialize the watermark layer
+        # Set watermark as added and render the initial watermark sprite
         self.watermark_handler.has_watermark = True
-        self.watermark_handler.watermark_layer = Image.new('RGBA', self.watermark_handler.image.size, (0, 0, 0, 0))
         self.watermark_handler._update_watermark()
 
     def close_control_panel(self):
@@ -5,90 +5,194 @@ import sys
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import filedialog
-from PIL import Image, ImageDraw, ImageFont, ImageTk
+from PIL import ImageTk
 import os
+import time
 from config.config import Config
+from config.image_loader import BackgroundTask
+from config.perf_stats import timed
+from config.watermark_renderer import (
+    WatermarkSettings, ExportOptions, sprite_for, tile_pattern, sprite_origin, sprite_rect,
+    composite_sprite, export_watermark, MIN_FONT_SIZE, MAX_FONT_SIZE
+)
+
+# Minimum time between overlay moves while dragging (~60 fps)
+FRAME_MS = 16
 
 class WatermarkHandler(CustomImageGallery):
-    def __init__(self, parent, img_path):
-        super().__init__(parent, img_path)
+    def __init__(self, parent, img_path, on_ready=None):
+        super().__init__(parent, img_path, on_ready)
         
         # Initialize watermark-specific attributes
         self.watermark_entry = None
         self.alpha_slider = None
         self.size_entry = None
         self.color_entry = None
+        self.tile_checkbox = None
+        self.logo_path = None  # Image watermark; replaces the text when set
         self.control_panel = None
         self.has_watermark = False
-        self.watermark_layer = None
         self.base_watermark_size = 36
         self.watermark_size = 36
         self.font = self._get_default_font()
+        # Drag overlay: the watermark as its own canvas item, moved without re-rendering
+        self.overlay_id, self.overlay_tk = None, None
+        self._move_job, self._last_move = None, 0.0
+        self.export_options = ExportOptions(
+            quality=Config.jpeg_quality,
+            progressive=Config.jpeg_progressive,
+            optimize=Config.optimize_output,
+            compress_level=Config.png_compress_level,
+            keep_metadata=Config.keep_metadata
+        )
 
-    def _recreate_watermark(self):
-        """Recreate watermark with current settings"""
-        if not self.has_watermark:
-            return
-            
-        # Create fresh watermark layer at the base image size
-        base_layer = Image.new('RGBA', self.base_image.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(base_layer)
-        
-        # Get current parameters
-        text = self.watermark_entry.get()
-        color = self.color_entry.get()
-        alpha = int(self.alpha_slider.get() * 2.55)  # Convert from 0-100 to 0-255
-        
+    def open_image(self, img_path):
+        """Show another image, keeping the canvas, control panel and watermark settings"""
+        if getattr(self, 'overlay_id', None) is not None:
+            self._end_watermark_drag()
+        super().open_image(img_path)
+        if self.has_watermark:
+            self._recreate_watermark()
+
+    def _current_settings(self):
+        """Snapshot the control panel into GUI-independent WatermarkSettings"""
         try:
             # Get and validate font size
             size_text = self.size_entry.get().strip()
             if size_text:  # Only update if there's a value
                 font_size = int(size_text)
-                self.watermark_size = max(12, min(font_size, 200))  # Clamp between 12 and 200
+                self.watermark_size = max(MIN_FONT_SIZE, min(font_size, MAX_FONT_SIZE))
         except (ValueError, TypeError):
             # Keep current size if invalid input
             pass
-        
-        # Process color with fallback
-        try:
-            if len(color) == 7 and color.startswith('#'):
-                r, g, b = int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
-                color = (r, g, b, alpha)
-            else:
-                color = (255, 255, 255, alpha)
-        except ValueError:
-            color = (255, 255, 255, alpha)
-        
-        # Load font with current size
-        try:
-            if self.font:
-                font = ImageFont.truetype(self.font, self.watermark_size)
-            else:
-                font = ImageFont.load_default()
-                # Scale default font if possible
-                if hasattr(font, 'size'):
-                    font = font.font_variant(size=self.watermark_size)
-        except Exception as e:
-            print(f"Font error: {e}")
-            font = ImageFont.load_default()
-        
-        # Calculate text position with new font size
-        text_bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
-        
-        # Center the text at watermark position
-        x = max(0, min(self.watermark_x - text_width // 2, self.base_image.width - text_width))
-        y = max(0, min(self.watermark_y - text_height // 2, self.base_image.height - text_height))
-        
-        # Draw watermark
-        draw.text((x, y), text, font=font, fill=color)
-        
-        # Store the base watermark layer
-        self.watermark_layer = base_layer
-        
-        # Update display
-        self.update_display()
+
+        tile = bool(self.tile_checkbox.get()) if self.tile_checkbox else False
+        return WatermarkSettings(
+            text=self.watermark_entry.get(),
+            font=self.font,
+            size=self.watermark_size,
+            color=self.color_entry.get(),
+            alpha=int(self.alpha_slider.get() * 2.55),  # Convert from 0-100 to 0-255
+            position=(self.watermark_x / self.base_image.width, self.watermark_y / self.base_image.height),
+            reference_width=self.base_image.width,
+            logo=self.logo_path,
+            logo_scale=Config.logo_scale,
+            angle=Config.tile_angle if tile else 0,
+            tile=tile,
+            spacing=Config.tile_spacing
+        )
+
+    @timed('recreate_watermark')
+    def _recreate_watermark(self):
+        """Recreate watermark with current settings"""
+        if not self.has_watermark:
+            return
+
+        self.watermark_settings = self._current_settings()
+
+        if self.composite is not None and self.composite.size == self.image.size:
+            self._redraw_watermark()
+        else:
+            self.update_display()
+
+    def _place_watermark(self, target):
+        """Composite the current sprite onto ``target`` and return the rectangle it covers"""
+        settings, zoomed_size = self.watermark_settings, self._zoomed_size()
+        if settings.tile:
+            # The pattern covers everything, so the whole view is dirty
+            center = (settings.position[0] * zoomed_size[0] - self.view_rect[0],
+                      settings.position[1] * zoomed_size[1] - self.view_rect[1])
+            self.watermark_sprite = None
+            tile_pattern(settings, zoomed_size[0]).blend(target, center)
+            return (0, 0) + target.size
+
+        # Sprites are cached, so a position-only change does not re-rasterize the text
+        self.watermark_sprite, self.watermark_text_size = sprite_for(settings, zoomed_size[0])
+        # Place on the whole zoomed image, then shift into the visible view rectangle
+        x, y = sprite_origin(zoomed_size, self.watermark_text_size, settings.position)
+        origin = (x - self.view_rect[0], y - self.view_rect[1])
+        composite_sprite(target, self.watermark_sprite, origin)
+        return sprite_rect(target.size, self.watermark_sprite.size, origin)
+
+    def _clear_watermark_rect(self):
+        """Restore the clean pixels under the baked-in watermark; returns the old rectangle"""
+        previous, self.watermark_rect = self.watermark_rect, None
+        if previous:
+            self.composite.paste(self.image.crop(previous).convert('RGBA'), previous[:2])
+        return previous
+
+    def _redraw_watermark(self):
+        """Repaint only the previous and new watermark rectangles"""
+        previous = self._clear_watermark_rect()
+        self.watermark_rect = self._place_watermark(self.composite)
+
+        for rect in (previous, self.watermark_rect):
+            if rect and rect[2] > rect[0] and rect[3] > rect[1]:
+                self._refresh_photo(rect)
+
+    def choose_logo(self):
+        """Pick an image to use as the watermark; cancelling goes back to text"""
+        path = filedialog.askopenfilename(
+            filetypes=[("Image files", "*.png;*.webp;*.gif;*.jpg;*.jpeg;*.bmp;*.tiff"), ("All Files", "*.*")]
+        )
+        self.logo_path = path or None
+        self._update_watermark()
+
+    def _refresh_photo(self, rect):
+        """Copy one rectangle of the composite into the on-screen PhotoImage"""
+        region = ImageTk.PhotoImage(self.composite.crop(rect))
+        self.canvas.tk.call(
+            str(self.img_tk), 'copy', str(region),
+            '-to', rect[0], rect[1], '-compositingrule', 'set'
+        )
+
+    def _overlay_coords(self):
+        """Canvas position of the drag overlay for the current watermark_x/y"""
+        position = (self.watermark_x / self.base_image.width, self.watermark_y / self.base_image.height)
+        x, y = sprite_origin(self._zoomed_size(), self.watermark_text_size, position)
+        left, top = self._image_canvas_origin()
+        return left + x, top + y
+
+    def _begin_watermark_drag(self):
+        """Lift the watermark off the preview into a separate canvas item"""
+        if self.watermark_sprite is None or self.composite is None:
+            return  # Tiled patterns are re-blended per frame instead
+        rect = self._clear_watermark_rect()
+        if rect and rect[2] > rect[0] and rect[3] > rect[1]:
+            self._refresh_photo(rect)
+
+        self.overlay_tk = ImageTk.PhotoImage(self.watermark_sprite)
+        self.overlay_id = self.canvas.create_image(*self._overlay_coords(), image=self.overlay_tk, anchor='nw')
+
+    def _schedule_watermark_move(self):
+        """Coalesce bursts of motion events into at most one overlay move per frame"""
+        if self._move_job is not None:
+            return
+        wait_ms = int(FRAME_MS - (time.perf_counter() - self._last_move) * 1000)
+        if wait_ms > 0:
+            self._move_job = self.after(wait_ms, self._flush_watermark_move)
+        else:
+            self._move_job = self.after_idle(self._flush_watermark_move)
+
+    @timed('drag_frame')
+    def _flush_watermark_move(self):
+        """Move the overlay to the latest drag position; no rasterizing or compositing"""
+        self._move_job = None
+        self._last_move = time.perf_counter()
+        if self.overlay_id is not None:
+            self.canvas.coords(self.overlay_id, *self._overlay_coords())
+        else:
+            self._update_watermark()
+
+    def _end_watermark_drag(self):
+        """Drop the overlay and bake the watermark into the preview at its final spot"""
+        if self._move_job is not None:
+            self.after_cancel(self._move_job)
+            self._move_job = None
+        if self.overlay_id is not None:
+            self.canvas.delete(self.overlay_id)
+            self.overlay_id, self.overlay_tk = None, None
+        self._update_watermark()
 
     def _update_watermark(self, event=None):
         """Update watermark in response to changes"""
@@ -103,7 +207,7 @@ class WatermarkHandler(CustomImageGallery):
         """Specific handler for font size changes"""
         try:
             new_size = int(self.size_entry.get())
-            if 12 <= new_size <= 200:
+            if MIN_FONT_SIZE <= new_size <= MAX_FONT_SIZE:
                 self.watermark_size = new_size
                 self._recreate_watermark()
         except ValueError:
@@ -120,53 +224,26 @@ class WatermarkHandler(CustomImageGallery):
             
         file_path = filedialog.asksaveasfilename(
             defaultextension=".png",
-            filetypes=[("PNG files", "*.png"), ("JPEG files", "*.jpg;*.jpeg")]
+            filetypes=[("PNG files", "*.png"), ("JPEG files", "*.jpg;*.jpeg"), ("WebP files", "*.webp")]
         )
         
         if file_path:
-            try:
-                # Create final composite at original size
-                base_img = self.base_image.copy()
-                if self.watermark_layer:
-                    watermark = self.watermark_layer.resize(
-                        base_img.size, 
-                        Image.Resampling.LANCZOS
-                    )
-                    final_image = Image.alpha_composite(
-                        base_img.convert('RGBA'), 
-                        watermark
-                    )
-                else:
-                    final_image = base_img
-                    
-                final_image.save(file_path)
-                messagebox.showinfo("Success", "Image saved successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save image: {str(e)}")    
-    
-    def update_display(self):
-        """Update the display with current image and watermark"""
-        if self.watermark_layer:
-            # Ensure watermark layer matches current image size
-            if self.watermark_layer.size != self.image.size:
-                self.watermark_layer = self.watermark_layer.resize(
-                    self.image.size, 
-                    Image.Resampling.LANCZOS
-                )
-            # Composite the watermark onto the image
-            composite = Image.alpha_composite(self.image.convert('RGBA'), self.watermark_layer)
-        else:
-            composite = self.image
-            
-        self.img_tk = ImageTk.PhotoImage(composite)
-        
-        if not hasattr(self, 'img_id'):
-            # Initialize image at the center of the canvas
-            self.img_id = self.canvas.create_image(
-                self.canvas_center_x,
-                self.canvas_center_y,
-                image=self.img_tk,
-                anchor='center'
-            )
+            # The full-resolution decode happens off the Tk thread so the editor stays responsive
+            BackgroundTask(
+                export_watermark, self.img_path, file_path, self._current_settings(), self.export_options
+            ).when_done(self, self._on_export_done)
+
+    def _on_export_done(self, result, error):
+        if error is None:
+            messagebox.showinfo("Success", "Image saved successfully!")
         else:
-            self.canvas.itemconfig(self.img_id, image=self.img_tk)
\ No newline at end of file
+            messagebox.showerror("Error", f"Failed to save image: {str(error)}")
+
+    @timed('update_display')
+    def update_display(self):
+        """Rebuild the visible preview from the current view and watermark"""
+        self.composite = self.image.convert('RGBA')
+        self.watermark_rect = None
+        if self.watermark_settings is not None:
+            self.watermark_rect = self._place_watermark(self.composite)
+        self._show(self.composite)
@@ -0,0 +1,343 @@
+# Section 3: Headless Watermark Rendering (no Tk required)
+import os
+from functools import lru_cache
+from PIL import ExifTags, Image, ImageDraw, ImageFont, ImageOps
+from config.perf_stats import timed
+
+DEFAULT_FONT_PATHS = [
+    "C:/Windows/Fonts/arial.ttf",
+    "C:/Windows/Fonts/segoeui.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/arial.ttf"
+]
+
+MIN_FONT_SIZE, MAX_FONT_SIZE = 12, 200
+
+# Rows composited per pass; keeps temporary RGBA buffers small on huge images
+STRIP_HEIGHT = 512
+
+# Loaded FreeType fonts and rasterized text sprites kept per process
+FONT_CACHE_SIZE = 32
+SPRITE_CACHE_SIZE = 64
+PATTERN_CACHE_SIZE = 4
+
+# Large scans (100+ MP) are expected input; raise Pillow's decompression-bomb guard accordingly
+Image.MAX_IMAGE_PIXELS = 1_000_000_000
+
+# Formats whose Pillow writers accept ``exif`` and ``icc_profile``
+METADATA_FORMATS = {'JPEG', 'PNG', 'WEBP', 'TIFF'}
+
+
+def find_default_font():
+    """Return the first available system font path, or None"""
+    for font_path in DEFAULT_FONT_PATHS:
+        if os.path.exists(font_path):
+            return font_path
+    return None
+
+
+def parse_color(color, alpha=255):
+    """Convert a '#RRGGBB' string to an RGBA tuple, falling back to white"""
+    try:
+        if len(color) == 7 and color.startswith('#'):
+            r, g, b = int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+            return (r, g, b, alpha)
+    except (ValueError, TypeError):
+        pass
+    return (255, 255, 255, alpha)
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def load_font(font_path, size):
+    """Load a TrueType font at the given size, falling back to Pillow's default (cached)"""
+    try:
+        if font_path:
+            return ImageFont.truetype(font_path, size)
+        font = ImageFont.load_default()
+        # Scale default font if possible
+        if hasattr(font, 'size'):
+            font = font.font_variant(size=size)
+        return font
+    except Exception as e:
+        print(f"Font error: {e}")
+        return ImageFont.load_default()
+
+
+class WatermarkSettings:
+    """Everything needed to render a watermark, independent of any widget.
+
+    Position is stored relative to the image (0.0-1.0) so the same settings can
+    be applied to images of any size. When ``reference_width`` is set, ``size``
+    is interpreted at that width and scaled proportionally for other images.
+    A ``logo`` path replaces the text with an image scaled to ``logo_scale`` of
+    the image width; ``tile`` repeats the watermark across the whole image.
+    Settings compare and hash by value so they can key the render caches.
+    """
+
+    def __init__(self, text="Watermark", font=None, size=36, color="#FFFFFF",
+                 alpha=255, position=(0.5, 0.5), reference_width=None,
+                 logo=None, logo_scale=0.25, angle=0, tile=False, spacing=0.5):
+        self.text = text
+        self.font = font if font is not None else find_default_font()
+        self.size = max(MIN_FONT_SIZE, min(int(size), MAX_FONT_SIZE))
+        self.color = color
+        self.alpha = max(0, min(int(alpha), 255))
+        self.position = tuple(position)
+        self.reference_width = reference_width
+        self.logo = logo
+        self.logo_scale = logo_scale
+        self.angle = angle
+        self.tile = tile
+        self.spacing = spacing
+
+    def key(self):
+        return (self.text, self.font, self.size, self.color, self.alpha, self.position,
+                self.reference_width, self.logo, self.logo_scale, self.angle, self.tile, self.spacing)
+
+    def __eq__(self, other):
+        return isinstance(other, WatermarkSettings) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def font_size_for(self, image_width):
+        """Font size in pixels for an image of the given width"""
+        if not self.reference_width:
+            return self.size
+        return max(1, round(self.size * image_width / self.reference_width))
+
+    def rgba(self):
+        return parse_color(self.color, self.alpha)
+
+
+def text_origin(image_size, text_size, center):
+    """Top-left corner for text centered at ``center``, clamped inside the image"""
+    (width, height), (text_width, text_height) = image_size, text_size
+    x = max(0, min(center[0] - text_width // 2, width - text_width))
+    y = max(0, min(center[1] - text_height // 2, height - text_height))
+    return x, y
+
+
+def render_text_sprite(settings, font_size):
+    """Rasterize the watermark text into a tightly cropped RGBA sprite.
+
+    Returns ``(sprite, text_size)``; ``text_size`` is the box used for centering,
+    which matches the placement the full-canvas layer used to get. Results are
+    cached on (text, font, size, color, alpha, angle), so the returned sprite is
+    shared and must not be modified.
+    """
+    return _text_sprite(settings.text, settings.font, font_size, settings.rgba(), settings.angle)
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def _text_sprite(text, font_path, font_size, fill, angle=0):
+    font = load_font(font_path, font_size)
+    text_bbox = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox((0, 0), text, font=font)
+    text_size = (text_bbox[2] - text_bbox[0], text_bbox[3] - text_bbox[1])
+
+    sprite = Image.new('RGBA', (max(1, text_bbox[2]), max(1, text_bbox[3])), (0, 0, 0, 0))
+    ImageDraw.Draw(sprite).text((0, 0), text, font=font, fill=fill)
+    if angle:
+        sprite = sprite.rotate(angle, Image.Resampling.BICUBIC, expand=True)
+        text_size = sprite.size
+    return sprite, text_size
+
+
+@lru_cache(maxsize=4)
+def _load_logo(path):
+    with Image.open(path) as logo:
+        return logo.convert('RGBA')
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def _logo_sprite(path, width, alpha, angle):
+    """Logo scaled to ``width``, faded to ``alpha`` and rotated; cached per variant"""
+    logo = _load_logo(path)
+    height = max(1, round(logo.height * width / logo.width))
+    sprite = logo.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    if alpha < 255:
+        sprite.putalpha(sprite.getchannel('A').point(lambda a: a * alpha // 255))
+    if angle:
+        sprite = sprite.rotate(angle, Image.Resampling.BICUBIC, expand=True)
+    return sprite
+
+
+def clear_render_caches():
+    """Drop cached fonts, sprites and tile patterns (e.g. to time cold renders)"""
+    for cached in (load_font, _text_sprite, _load_logo, _logo_sprite, _tile_pattern):
+        cached.cache_clear()
+
+
+def _sprite_key(settings, image_width):
+    """Hashable inputs that fully determine the sprite for ``settings`` at ``image_width``"""
+    if settings.logo:
+        width = max(1, round(image_width * settings.logo_scale))
+        return ('logo', settings.logo, width, settings.alpha, settings.angle)
+    return ('text', settings.text, settings.font, settings.font_size_for(image_width),
+            settings.rgba(), settings.angle)
+
+
+def _sprite(key):
+    if key[0] == 'logo':
+        sprite = _logo_sprite(*key[1:])
+        return sprite, sprite.size
+    return _text_sprite(*key[1:])
+
+
+def sprite_for(settings, image_width):
+    """Cached ``(sprite, centering size)`` for the settings on an image ``image_width`` wide"""
+    return _sprite(_sprite_key(settings, image_width))
+
+
+def tile_pattern(settings, image_width):
+    """Premultiplied tile pattern for the settings, prepared once per image width.
+
+    Cached on the sprite inputs and spacing only, so moving the pattern (a new
+    ``position``) reuses it.
+    """
+    return _tile_pattern(_sprite_key(settings, image_width), image_width, settings.spacing)
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _tile_pattern(key, image_width, spacing):
+    # Imported here so NumPy is only loaded once a tiled watermark is actually used
+    from config.pattern_blend import TilePattern
+    sprite, _ = _sprite(key)
+    return TilePattern(sprite, image_width, spacing)
+
+
+def sprite_origin(image_size, text_size, position):
+    """Integer top-left corner for a sprite centered at a relative ``position``"""
+    center = (position[0] * image_size[0], position[1] * image_size[1])
+    x, y = text_origin(image_size, text_size, center)
+    return int(x), int(y)
+
+
+def sprite_rect(image_size, sprite_size, origin):
+    """Part of the image covered by a sprite at ``origin``, as (left, top, right, bottom)"""
+    left, top = max(0, origin[0]), max(0, origin[1])
+    right = min(image_size[0], origin[0] + sprite_size[0])
+    bottom = min(image_size[1], origin[1] + sprite_size[1])
+    return left, top, max(left, right), max(top, bottom)
+
+
+def composite_sprite(image, sprite, origin, strip_height=STRIP_HEIGHT):
+    """Alpha-composite ``sprite`` onto ``image`` in place at ``origin``.
+
+    Only the rows and columns the sprite covers are touched, and they are
+    processed in horizontal strips so the temporary RGBA buffers stay small
+    regardless of image or sprite size. ``image`` must be RGB or RGBA and
+    ``origin`` a pair of ints.
+    """
+    ox, oy = origin
+    left, top, right, bottom = sprite_rect(image.size, sprite.size, origin)
+    if right <= left:
+        return image
+
+    for y in range(top, bottom, strip_height):
+        box = (left, y, right, min(bottom, y + strip_height))
+        region = image.crop(box).convert('RGBA')
+        region.alpha_composite(sprite.crop((left - ox, box[1] - oy, right - ox, box[3] - oy)))
+        image.paste(region if image.mode == 'RGBA' else region.convert(image.mode), box)
+    return image
+
+
+def editable_image(image):
+    """Return ``image`` itself if it is RGB/RGBA, otherwise a converted copy"""
+    if image.mode in ('RGB', 'RGBA'):
+        return image
+    if image.mode.startswith('I'):
+        # 16/32-bit samples: scale the 16-bit range down instead of clipping everything above 255
+        image = image.convert('I').point(lambda value: value * (1 / 256)).convert('L')
+    has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def apply_watermark(image, settings):
+    """Draw the watermark onto an RGB/RGBA ``image`` in place and return it"""
+    if settings.tile:
+        center = (settings.position[0] * image.width, settings.position[1] * image.height)
+        return tile_pattern(settings, image.width).blend(image, center)
+    sprite, text_size = sprite_for(settings, image.width)
+    return composite_sprite(image, sprite, sprite_origin(image.size, text_size, settings.position))
+
+
+def render_watermark(image, settings):
+    """Return a new image with the watermark composited onto ``image``"""
+    return apply_watermark(editable_image(image).copy(), settings)
+
+
+class ExportOptions:
+    """Encoder settings used when writing watermarked images"""
+
+    def __init__(self, quality=95, progressive=False, optimize=False,
+                 compress_level=6, lossless=False, keep_metadata=True):
+        self.quality = max(1, min(int(quality), 100))
+        self.progressive = progressive
+        self.optimize = optimize
+        self.compress_level = max(0, min(int(compress_level), 9))
+        self.lossless = lossless
+        self.keep_metadata = keep_metadata
+
+    def params_for(self, image_format):
+        """Pillow ``save()`` keyword arguments for the given format name"""
+        if image_format == 'JPEG':
+            return {'quality': self.quality, 'progressive': self.progressive, 'optimize': self.optimize}
+        if image_format == 'PNG':
+            return {'compress_level': self.compress_level, 'optimize': self.optimize}
+        if image_format == 'WEBP':
+            return {'quality': self.quality, 'lossless': self.lossless, 'method': 6 if self.optimize else 4}
+        return {}
+
+
+def read_metadata(image):
+    """Collect the EXIF and ICC profile of an opened source image.
+
+    Exports are always RGB(A), so only RGB profiles are kept; a CMYK or gray
+    profile would no longer describe the converted pixels. Exported pixels are
+    always upright (see ``export_watermark``), so the Orientation tag is dropped.
+    """
+    metadata = {}
+    exif = image.getexif()
+    exif.pop(ExifTags.Base.Orientation, None)
+    if exif:
+        metadata['exif'] = exif.tobytes()
+    icc_profile = image.info.get('icc_profile')
+    if icc_profile and icc_profile[16:20] == b'RGB ':  # Color space field of the profile header
+        metadata['icc_profile'] = icc_profile
+    return metadata
+
+
+def save_image(image, file_path, options=None, metadata=None):
+    """Save ``image`` with the encoder settings for its extension.
+
+    Alpha is flattened for formats that cannot store it, and ``metadata`` (as
+    returned by ``read_metadata``) is written back when ``options.keep_metadata``.
+    """
+    options = options or ExportOptions()
+    image_format = Image.registered_extensions().get(os.path.splitext(file_path)[1].lower())
+    if image_format in ('JPEG', 'BMP') and image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    params = options.params_for(image_format)
+    if options.keep_metadata and metadata and image_format in METADATA_FORMATS:
+        params.update(metadata)
+    image.save(file_path, format=image_format, **params)
+
+
+@timed('export')
+def export_watermark(source_path, file_path, settings, options=None):
+    """Watermark ``source_path`` at its full resolution and write it to ``file_path``.
+
+    The source is decoded once and composited in place; only the area under the
+    watermark is converted to RGBA, so peak memory is about one decoded copy of
+    the source instead of several full-size RGBA buffers. The EXIF orientation
+    is applied first, so the watermark lands where the (upright) preview showed it.
+    """
+    with Image.open(source_path) as source:
+        ImageOps.exif_transpose(source, in_place=True)
+        metadata = read_metadata(source)
+        image = apply_watermark(editable_image(source), settings)
+        save_image(image, file_path, options, metadata)
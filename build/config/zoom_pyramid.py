@@ -0,0 +1,60 @@
+# Section 5: Zoom Pyramid & Viewport Rendering for the preview canvas
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+
+class ZoomPyramid:
+    """Progressively halved copies of an image, built on a background thread.
+
+    Zooming out samples from the smallest level that is still at least as large
+    as the requested scale, so a resize never reads more pixels than it needs.
+    Only the requested viewport is resampled, and recent results are cached per
+    zoom level and viewport.
+    """
+
+    MIN_SIZE = 64  # Stop halving once the short side would drop below this
+    CACHE_SIZE = 8
+
+    def __init__(self, image, min_scale=0.0):
+        self.image = image
+        self.min_scale = min_scale  # Smallest zoom the viewer can reach; no levels below it
+        self.levels = [(1.0, image)]  # (scale, image), largest first
+        self._cache = OrderedDict()
+        self._thread = threading.Thread(target=self._build, daemon=True)
+        self._thread.start()
+
+    def _build(self):
+        """Compute the halved levels; published one at a time so readers never block"""
+        scale, image = self.levels[0]
+        while min(image.size) // 2 >= self.MIN_SIZE and scale / 2 >= self.min_scale:
+            image = image.reduce(2)
+            scale /= 2
+            self.levels = self.levels + [(scale, image)]
+
+    def level_for(self, zoom):
+        """Smallest ready level whose scale is still >= ``zoom``"""
+        best = self.levels[0]
+        for level in self.levels:
+            if level[0] >= zoom:
+                best = level
+        return best
+
+    def render(self, zoom, view, resample=Image.Resampling.LANCZOS):
+        """Return the ``view`` rectangle (in zoomed pixel coordinates) of the image at ``zoom``"""
+        scale, level = self.level_for(zoom)
+        key = (round(zoom, 4), view, resample, scale)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        factor = scale / zoom
+        box = tuple(v * factor for v in view)
+        size = (max(1, view[2] - view[0]), max(1, view[3] - view[1]))
+        rendered = level.resize(size, resample, box=box)
+
+        self._cache[key] = rendered
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return rendered
@@ -1,28 +1,58 @@
+import time
+START_TIME = time.perf_counter()  # Cold-start reference, taken before the GUI toolkits load
+
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 from tkinterdnd2 import DND_FILES, TkinterDnD
 from config.config import Config
+from config.perf_stats import stats, timed
 from PIL import ImageTk, Image
 from customtkinter import CTkImage  
 
+ASSETS_PATH = Path(__file__).parent / "assets" / "frame0"
+
+# Delay before importing the editor in the background of an idle upload screen
+EDITOR_PRELOAD_MS = 100
+
+
+@lru_cache(maxsize=None)
+def load_asset(name):
+    """Decoded asset image, read from disk once per process"""
+    with Image.open(ASSETS_PATH / name) as image:
+        return image.convert("RGBA")
+
+
 class WatermarkApp(TkinterDnD.Tk):
+    """Single long-lived window that swaps the upload screen and the editor screen"""
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
         self.selected_image_path = Config.selected_file_path
-        self.output_path = Path(__file__).parent
-        self.assets_path = self.output_path / Path(r"/run/media/ejarao/STORAGE/4 Dev Library/1 Src/build/assets/frame0")
+        self.editor = None  # gui1.EditorScreen, created on first use and then kept
         self._set_appearance_mode(Config.appearance_mode)
         self._set_default_theme(Config.theme)
 
         # Setup window
         self.geometry("800x600")
         self.title("Watermark Tool")
+        self.resizable(False, False)
         self._create_widgets()
         self._bind_drag_and_drop()
+        self.after_idle(self._on_first_idle)
+
+    def _on_first_idle(self):
+        if stats.enabled:
+            stats.record('cold_start', time.perf_counter() - START_TIME)
+        # Pay for the editor imports while the user is still choosing a file
+        self.after(EDITOR_PRELOAD_MS, self._preload_editor)
+
+    def _preload_editor(self):
+        import gui1  # noqa: F401
 
     def _set_appearance_mode(self, mode):
         ctk.set_appearance_mode(mode)  # Set appearance mode: "dark" or "light"
@@ -40,8 +70,7 @@ class WatermarkApp(TkinterDnD.Tk):
         self._add_buttons()
 
     def _add_image(self):
-        image_path = "build/assets/frame0/image_1.png"
-        img = Image.open(image_path).convert("RGBA")
+        img = load_asset("image_1.png")
         image_resized = img.resize((600, 450), Image.LANCZOS)
         photo = ImageTk.PhotoImage(image_resized)
         
@@ -66,8 +95,7 @@ class WatermarkApp(TkinterDnD.Tk):
 
     def _add_buttons(self):
         # Select file button
-        image_path = "build/assets/frame0/image.png"
-        img = Image.open(image_path).resize((15, 15))
+        img = load_asset("image.png").resize((15, 15))
         tk_image = CTkImage(img)
         
         select_button = ctk.CTkButton(self.frame, text="Select File", width=305, height=60, text_color="black", image=tk_image, compound="left", command=self.select_file)
@@ -99,10 +127,22 @@ class WatermarkApp(TkinterDnD.Tk):
         else:
             messagebox.showwarning("Invalid File Type", "The selected file is not an image. Please select a valid image file.")
 
+    @timed('show_editor')
     def open_screen_2(self):
         print(f"Transitioning to Screen 2 with selected_file_path: {Config.selected_file_path}")
-        self.destroy()
-        import gui1  # Import and run Screen 2
+        if self.editor is None:
+            from gui1 import EditorScreen  # Heavy editor modules load on first use only
+            self.editor = EditorScreen(self, on_return=self.show_upload)
+        if not self.editor.open_image(Config.selected_file_path):
+            return
+        self.frame.place_forget()
+        self.editor.place(x=0, y=0, width=800, height=600)
+
+    @timed('show_upload')
+    def show_upload(self):
+        """Return to the upload screen; the editor stays alive for the next image"""
+        self.editor.place_forget()
+        self.frame.place(x=0, y=0)
 
 if __name__ == "__main__":
     app = WatermarkApp()
@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import pytest
+from PIL import Image
+from config import batch_processor
+from config.batch_processor import batch_watermark, collect_inputs
+from config.manifest import MANIFEST_NAME
+from config.watermark_renderer import WatermarkSettings
+
+
+def run(sources, output_dir, text, **kwargs):
+    """Run a single-worker batch and return ``{source: skipped}`` for the files that succeeded"""
+    results = {}
+
+    def on_result(source, destination, error, skipped):
+        assert error is None, error
+        results[source] = skipped
+
+    failures = batch_watermark(sources, str(output_dir), WatermarkSettings(text=text, size=24),
+                               workers=1, on_result=on_result, **kwargs)
+    assert failures == []
+    return results
+
+
+def make_source(tmp_path, name="photo.png", color="navy"):
+    path = tmp_path / name
+    Image.new('RGB', (200, 120), color).save(path)
+    return str(path)
+
+
+def pixels(path):
+    with Image.open(path) as image:
+        return image.tobytes()
+
+
+def test_unchanged_sources_are_skipped(tmp_path):
+    source = make_source(tmp_path)
+    output = tmp_path / "out"
+
+    assert run([source], output, "AAA") == {source: False}
+    assert run([source], output, "AAA") == {source: True}
+    assert (output / MANIFEST_NAME).exists()
+
+
+def test_changed_settings_reprocess(tmp_path):
+    source = make_source(tmp_path)
+    output = tmp_path / "out"
+
+    run([source], output, "AAA")
+    assert run([source], output, "ZZZ") == {source: False}
+
+
+def test_changed_source_content_reprocesses(tmp_path):
+    source = make_source(tmp_path)
+    output = tmp_path / "out"
+
+    run([source], output, "AAA")
+    make_source(tmp_path, color="maroon")
+    os.utime(source, ns=(0, 0))  # Different mtime, so the stat shortcut cannot apply
+    assert run([source], output, "AAA") == {source: False}
+
+
+def test_force_updates_manifest(tmp_path):
+    source = make_source(tmp_path)
+    output = tmp_path / "out"
+    destination = str(output / "photo.png")
+
+    run([source], output, "AAA")
+    expected = pixels(destination)
+
+    assert run([source], output, "ZZZ", force=True) == {source: False}
+    assert pixels(destination) != expected
+
+    # The forced run recorded ZZZ, so going back to AAA must rewrite the file
+    assert run([source], output, "AAA") == {source: False}
+    assert pixels(destination) == expected
+    assert run([source], output, "AAA") == {source: True}
+
+
+def test_outputs_inside_inputs_are_not_collected(tmp_path):
+    photos = tmp_path / "photos"
+    (photos / "a").mkdir(parents=True)
+    source = make_source(photos / "a", "x.jpg")
+    output = photos / "wm"
+
+    for _ in range(3):
+        paths = collect_inputs([str(photos / "**" / "*.jpg")], exclude_dir=str(output))
+        assert [path for path, _ in paths] == [source]
+        run(paths, output, "AAA")
+
+    assert sorted(p.relative_to(output).as_posix() for p in output.rglob("*.jpg")) == ["a/x.jpg"]
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason="workers must inherit the patched exporter")
+def test_crashed_worker_only_fails_its_file(tmp_path, monkeypatch):
+    sources = [make_source(tmp_path, f"photo{i}.png") for i in range(6)]
+    export = batch_processor.export_watermark
+
+    def crash_on_second(source_path, *args):
+        if source_path == sources[1]:
+            os._exit(1)  # Simulates the OS killing the worker, e.g. out of memory
+        return export(source_path, *args)
+
+    monkeypatch.setattr(batch_processor, "export_watermark", crash_on_second)
+    results = {}
+    failures = batch_watermark(sources, str(tmp_path / "out"), WatermarkSettings(), workers=2,
+                               on_result=lambda source, destination, error, skipped:
+                               results.setdefault(source, error))
+
+    assert [source for source, _ in failures] == [sources[1]]
+    assert all(results[source] is None for source in sources if source != sources[1])
+    assert all((tmp_path / "out" / os.path.basename(source)).exists() for source in sources if source != sources[1])
@@ -0,0 +1,34 @@
+from PIL import ExifTags, Image
+from config.image_loader import load_preview, read_size
+from config.watermark_renderer import WatermarkSettings, export_watermark
+
+
+def make_rotated_jpeg(path):
+    """300x200 JPEG stored sideways: Orientation 6 shows it as 200x300"""
+    image = Image.new('RGB', (300, 200), 'black')
+    exif = image.getexif()
+    exif[ExifTags.Base.Orientation] = 6
+    image.save(path, exif=exif.tobytes())
+
+
+def test_export_applies_exif_orientation(tmp_path):
+    source, output = tmp_path / "rotated.jpg", tmp_path / "out.jpg"
+    make_rotated_jpeg(source)
+
+    export_watermark(str(source), str(output), WatermarkSettings(text="MARK", size=24, position=(0.5, 0.9)))
+
+    with Image.open(output) as result:
+        assert result.size == (200, 300)
+        assert ExifTags.Base.Orientation not in result.getexif()
+        left, top, right, bottom = result.convert('L').point(lambda v: 255 if v > 128 else 0).getbbox()
+    # Watermark centered near the bottom of the upright image
+    assert abs((left + right) / 2 - 100) < 10
+    assert top > 220
+
+
+def test_preview_uses_upright_size(tmp_path):
+    source = tmp_path / "rotated.jpg"
+    make_rotated_jpeg(source)
+
+    assert read_size(source) == (200, 300)
+    assert load_preview(source, (100, 150)).size == (100, 150)